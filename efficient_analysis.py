@@ -14,9 +14,8 @@ Features:
 """
 
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from typing import Dict, Tuple, Optional
+from functools import partial
+from typing import Any, Dict, Tuple, Optional
 import numpy as np
 from visualize import create_pie_chart, create_horizontal_bar_chart
 
@@ -34,6 +33,39 @@ class Analyzer:
     pre-categorized DataFrames, eliminating repeated filtering operations.
     """
 
+    # How each analyzed category is aggregated; keyword arguments for _aggregate
+    _SPECS: Dict[str, Dict[str, Any]] = {
+        # Money in
+        "ReceivedMoney": {"amount_col": "paid_in"},
+        "ReceivedMoney_business": {"amount_col": "paid_in"},
+        "Deposit": {"amount_col": "paid_in", "sort_by": "amount"},
+        "Pochi_in": {"amount_col": "paid_in"},
+        # Money out
+        "SendMoney": {"amount_col": "withdrawn", "split_charges": True},
+        "businessPayment_toCustomer": {
+            "amount_col": "withdrawn",
+            "split_charges": True,
+        },
+        "BuyGoodsPayments": {"amount_col": "withdrawn", "split_charges": True},
+        "PayBillPayments": {
+            "amount_col": "withdrawn",
+            "split_charges": True,
+            "with_accounts": True,
+        },
+        "Pochi": {"amount_col": "withdrawn"},
+        "CashWithdrawals": {
+            "amount_col": "withdrawn",
+            "sort_by": "amount",
+            "split_charges": True,
+        },
+        # Pie chart for airtime (different from other analyses)
+        "airtime_bundle": {
+            "amount_col": "withdrawn",
+            "sort_by": "amount",
+            "chart": "pie",
+        },
+    }
+
     def __init__(self, categorized_data: Dict[str, pd.DataFrame]):
         """
         Initialize the analyzer with pre-categorized data.
@@ -43,6 +75,119 @@ class Analyzer:
         """
         self.data = categorized_data
 
+    def _analyze(self, category: str) -> Tuple:
+        """
+        Analyze a category using its entry in the _SPECS table.
+
+        Args:
+            category: Category name, a key of _SPECS
+
+        Returns:
+            Tuple of (figure, total_amount, total_charges, total_transactions, frame, raw_df)
+        """
+        return self._aggregate(category, **self._SPECS[category])
+
+    def _aggregate(
+        self,
+        category: str,
+        amount_col: str,
+        sort_by: str = "count",
+        split_charges: bool = False,
+        chart: str = "bar",
+        with_accounts: bool = False,
+    ) -> Tuple:
+        """
+        Aggregate one category by entity.
+
+        Args:
+            category: Category name in the pre-categorized data
+            amount_col: Amount column to total ("paid_in" or "withdrawn")
+            sort_by: Column of the grouped frame to sort by ("count" or "amount")
+            split_charges: Separate charge rows from the transactions themselves
+            chart: "bar" for a horizontal bar chart, "pie" for a pie chart
+            with_accounts: Add the comma-joined unique account numbers per entity
+
+        Returns:
+            Tuple of (figure, total_amount, total_charges, total_transactions, frame, raw_df),
+            where figure is a zero-argument callable that builds the Plotly chart
+        """
+        df = self.data.get(category, pd.DataFrame())
+        result = None, 0, 0, 0, pd.DataFrame(), pd.DataFrame()
+
+        if not df.empty:
+            # Calculate totals, splitting charges from transactions in one pass
+            if split_charges:
+                sums = df.groupby("is_charge", sort=False)[amount_col].sum()
+                total_amount = sums.get(False, 0.0)
+                total_charges = sums.get(True, 0.0)
+                transactions = df.loc[~df["is_charge"]]
+            else:
+                total_amount = df[amount_col].sum()
+                total_charges = 0
+                transactions = df
+
+            if not transactions.empty:
+                total_transactions = transactions["receipt_no"].nunique()
+
+                # Group by entity
+                grouped = (
+                    transactions.groupby("processed_entity", observed=True, sort=False)[
+                        ["receipt_no", amount_col]
+                    ]
+                    .agg({"receipt_no": "count", amount_col: "sum"})
+                    .rename(columns={"receipt_no": "count", amount_col: "amount"})
+                )
+
+                # Unique accounts per entity in one hash pass, joined per group
+                if with_accounts:
+                    accounts = (
+                        transactions.dropna(subset=["account_no"])
+                        .groupby("processed_entity", observed=True, sort=False)[
+                            "account_no"
+                        ]
+                        .unique()
+                        .map(", ".join)
+                    )
+                    grouped.insert(
+                        0, "accounts", accounts.reindex(grouped.index, fill_value="")
+                    )
+
+                frame = grouped.sort_values(by=sort_by, ascending=False).reset_index()
+
+                # Defer figure construction until the chart is rendered. The
+                # callable pickles as a function name and the frame, so the
+                # results m_top caches restore cheaply on each rerun
+                if chart == "pie":
+                    fig = partial(
+                        create_pie_chart,
+                        data=frame,
+                        values_col="amount",
+                        names_col="processed_entity",
+                        title="",
+                    )
+                else:
+                    # Only the top entities are plotted; the table keeps the full
+                    # frame. The chart selects them itself, and only if rendered
+                    fig = partial(
+                        create_horizontal_bar_chart,
+                        data=frame,
+                        y_col="processed_entity",
+                        x_col="amount",
+                        title="",
+                        n_largest=N_LARGEST,
+                    )
+
+                result = (
+                    fig,
+                    total_amount,
+                    total_charges,
+                    total_transactions,
+                    frame,
+                    transactions,
+                )
+
+        return result
+
     # ============================================================================
     # MONEY IN CATEGORIES
     # ============================================================================
@@ -52,158 +197,40 @@ class Analyzer:
         Analyze received money transactions.
 
         Returns:
-            Tuple of (figure, total_received, total_transactions, receive_frame)
+            Tuple of (figure, total_amount, total_charges, total_transactions, frame, raw_df),
+            where figure is a zero-argument callable that builds the Plotly chart
         """
-        receive_df = self.data.get("ReceivedMoney", pd.DataFrame())
-
-        if receive_df.empty:
-            return None, 0, 0, 0, pd.DataFrame(), pd.DataFrame()
-
-        # Calculate totals
-        total_received = receive_df["paid_in"].sum()
-        total_transactions = receive_df.nunique()["receipt_no"]
-
-        # Group by sender
-        receive_frame = (
-            receive_df.groupby("processed_entity")
-            .agg(
-                count=("receipt_no", "count"),
-                amount=("paid_in", "sum"),
-            )
-            .sort_values(by="count", ascending=False)
-            .reset_index()
-        )
-
-        # Create visualization
-        fig = create_horizontal_bar_chart(
-            data=receive_frame, x_col="amount", y_col="processed_entity", title=f""
-        )
-
-        return (
-            fig,
-            total_received,
-            None,  # there are no charges but i wanted to standardize the return type
-            total_transactions,
-            receive_frame,
-            receive_df,
-        )
+        return self._analyze("ReceivedMoney")
 
     def ReceivedMoney_business(self) -> Tuple:
         """
         Analyze business received money transactions.
 
         Returns:
-            Tuple of (figure, total_received, total_charges, total_transactions, frame, raw_df)
+            Tuple of (figure, total_amount, total_charges, total_transactions, frame, raw_df),
+            where figure is a zero-argument callable that builds the Plotly chart
         """
-        # TODO: Implement business received money analysis
-        # This should analyze funds received from business payments, salary payments, etc.
-        business_df = self.data.get("ReceivedMoney_business", pd.DataFrame())
-
-        if business_df.empty:
-            return None, 0, 0, 0, pd.DataFrame(), pd.DataFrame()
-
-        # Calculate totals
-        total_received = business_df["paid_in"].sum()
-        total_transactions = business_df.nunique()["receipt_no"]
-
-        # Group by sender (business entity)
-        business_frame = (
-            business_df.groupby("processed_entity")
-            .agg(
-                count=("receipt_no", "count"),
-                amount=("paid_in", "sum"),
-            )
-            .sort_values(by="count", ascending=False)
-            .reset_index()
-        )
-
-        # Create visualization
-        fig = create_horizontal_bar_chart(
-            data=business_frame, x_col="amount", y_col="processed_entity", title=f""
-        )
-
-        return (
-            fig,
-            total_received,
-            0,  # No charges, standardize return type
-            total_transactions,
-            business_frame,
-            business_df,
-        )
+        return self._analyze("ReceivedMoney_business")
 
     def Deposit(self) -> Tuple:
         """
         Analyze deposit transactions.
 
         Returns:
-            Tuple of (figure, total_deposited, total_transactions, deposit_frame)
+            Tuple of (figure, total_amount, total_charges, total_transactions, frame, raw_df),
+            where figure is a zero-argument callable that builds the Plotly chart
         """
-        deposit_df = self.data.get("Deposit", pd.DataFrame())
-
-        if deposit_df.empty:
-            return None, 0, 0, 0, pd.DataFrame(), pd.DataFrame()
-
-        # Calculate totals
-        total_deposited = deposit_df["paid_in"].sum()
-        total_transactions = deposit_df.nunique()["receipt_no"]
-
-        # Group by source
-        deposit_frame = (
-            deposit_df.groupby("processed_entity")
-            .agg(
-                count=("receipt_no", "count"),
-                amount=("paid_in", "sum"),
-            )
-            .sort_values(by="amount", ascending=False)
-            .reset_index()
-        )
-
-        # Create visualization
-        fig = create_horizontal_bar_chart(
-            data=deposit_frame,
-            y_col="processed_entity",
-            x_col="amount",
-            title="",
-        )
-
-        return fig, total_deposited, 0, total_transactions, deposit_frame, deposit_df
+        return self._analyze("Deposit")
 
     def Pochi_in(self) -> Tuple:
         """
         Analyze Pochi In transactions.
 
         Returns:
-            Tuple of (figure, total_amount, total_charges, total_transactions, frame, raw_df)
+            Tuple of (figure, total_amount, total_charges, total_transactions, frame, raw_df),
+            where figure is a zero-argument callable that builds the Plotly chart
         """
-        pochi_in_df = self.data.get("Pochi_in", pd.DataFrame())
-
-        if pochi_in_df.empty:
-            return None, 0, 0, 0, pd.DataFrame(), pd.DataFrame()
-
-        # Calculate totals
-        total_amount = pochi_in_df["paid_in"].sum()
-        total_transactions = pochi_in_df["receipt_no"].nunique()
-
-        # Group by entity
-        pochi_in_frame = (
-            pochi_in_df.groupby("processed_entity")
-            .agg(
-                count=("receipt_no", "count"),
-                amount=("paid_in", "sum"),
-            )
-            .sort_values(by="count", ascending=False)
-            .reset_index()
-        )
-
-        # Create visualization
-        fig = create_horizontal_bar_chart(
-            data=pochi_in_frame,
-            y_col="processed_entity",
-            x_col="amount",
-            title="",
-        )
-
-        return fig, total_amount, 0, total_transactions, pochi_in_frame, pochi_in_df
+        return self._analyze("Pochi_in")
 
     def Reversals(self) -> Tuple:
         """
@@ -299,105 +326,20 @@ class Analyzer:
         Analyze Send Money transactions.
 
         Returns:
-            Tuple of (figure, total_spend, total_charges, transaction_count, transfer_frame)
-        """
-        transfer_df = self.data.get("SendMoney", pd.DataFrame())
-
-        if transfer_df.empty:
-            return None, 0, 0, 0, pd.DataFrame()
-
-        # Separate transfers from charges
-        transfers = transfer_df[~transfer_df["is_charge"]]
-        charges = transfer_df[transfer_df["is_charge"]]
-
-        if transfers.empty:
-            return None, 0, 0, 0, pd.DataFrame()
-
-        # Calculate totals
-        total_spend = transfers["withdrawn"].sum()
-        total_charges = charges["withdrawn"].sum()
-        transaction_count = transfers.nunique()["receipt_no"]
-
-        # Group by recipient
-        transfer_frame = (
-            transfers.groupby("processed_entity")
-            .agg(
-                count=("receipt_no", "count"),
-                amount=("withdrawn", "sum"),
-            )
-            .sort_values(by="count", ascending=False)
-            .reset_index()
-        )
-
-        # Create visualization
-        fig = create_horizontal_bar_chart(
-            data=transfer_frame,
-            y_col="processed_entity",
-            x_col="amount",
-            title="",
-        )
-
-        return (
-            fig,
-            total_spend,
-            total_charges,
-            transaction_count,
-            transfer_frame,
-            transfers,
-        )
+            Tuple of (figure, total_amount, total_charges, total_transactions, frame, raw_df),
+            where figure is a zero-argument callable that builds the Plotly chart
+        """
+        return self._analyze("SendMoney")
 
     def businessPayment_toCustomer(self) -> Tuple:
         """
         Analyze business payments to customers.
 
         Returns:
-            Tuple of (figure, total_amount, total_charges, total_transactions, frame, raw_df)
+            Tuple of (figure, total_amount, total_charges, total_transactions, frame, raw_df),
+            where figure is a zero-argument callable that builds the Plotly chart
         """
-        business_customer_df = self.data.get(
-            "businessPayment_toCustomer", pd.DataFrame()
-        )
-
-        if business_customer_df.empty:
-            return None, 0, 0, 0, pd.DataFrame(), pd.DataFrame()
-
-        # Separate transfers from charges
-        transfers = business_customer_df[~business_customer_df["is_charge"]]
-        charges = business_customer_df[business_customer_df["is_charge"]]
-
-        if transfers.empty:
-            return None, 0, 0, 0, pd.DataFrame()
-
-        total_spend = transfers["withdrawn"].sum()
-        total_charges = charges["withdrawn"].sum()
-        transaction_count = transfers.nunique()["receipt_no"]
-
-        # Group by recipient
-        transfer_frame = (
-            transfers.groupby("processed_entity")
-            .agg(
-                count=("receipt_no", "count"),
-                amount=("withdrawn", "sum"),
-            )
-            .sort_values(by="count", ascending=False)
-            .reset_index()
-        )
-
-        # Create visualization
-        fig = create_horizontal_bar_chart(
-            data=transfer_frame,
-            y_col="processed_entity",
-            x_col="amount",
-            title="",
-        )
-
-        return (
-            fig,
-            total_spend,
-            total_charges,
-            transaction_count,
-            transfer_frame,
-            transfers,
-        )
+        return self._analyze("businessPayment_toCustomer")
 
     def Overdraft(self) -> Tuple:
         """
@@ -421,236 +363,50 @@ class Analyzer:
         Analyze Buy Goods transactions.
 
         Returns:
-            Tuple of (figure, total_spend, total_charges, BuyGoodsMerchants_count, BuyGoodsMerchants_frame)
-        """
-        buygoods_df = self.data.get("BuyGoodsPayments", pd.DataFrame())
-
-        if buygoods_df.empty:
-            return None, 0, 0, 0, pd.DataFrame()
-
-        # Separate payments from charges
-        payments = buygoods_df[~buygoods_df["is_charge"]]
-        charges = buygoods_df[buygoods_df["is_charge"]]
-
-        if payments.empty:
-            return None, 0, 0, 0, pd.DataFrame()
-
-        # Calculate totals
-        total_spend = payments["withdrawn"].sum()
-        total_charges = charges["withdrawn"].sum()
-        BuyGoodsMerchants_count = payments.nunique()["receipt_no"]
-
-        # Group by BuyGoodsMerchants
-
-        BuyGoodsMerchants_frame = (
-            payments.groupby("processed_entity")
-            .agg(
-                count=("receipt_no", "count"),
-                amount=("withdrawn", "sum"),
-            )
-            .sort_values(by="count", ascending=False)
-            .reset_index()
-        )
-
-        # Create visualization
-        fig = create_horizontal_bar_chart(
-            data=BuyGoodsMerchants_frame,
-            y_col="processed_entity",
-            x_col="amount",
-            title="",
-        )
-
-        return (
-            fig,
-            total_spend,
-            total_charges,
-            BuyGoodsMerchants_count,
-            BuyGoodsMerchants_frame,
-            payments,
-        )
+            Tuple of (figure, total_amount, total_charges, total_transactions, frame, raw_df),
+            where figure is a zero-argument callable that builds the Plotly chart
+        """
+        return self._analyze("BuyGoodsPayments")
 
     def PayBillPayments(self) -> Tuple:
         """
         Analyze paybill transactions.
 
         Returns:
-            Tuple of (figure, total_amount, total_charges, total_transactions, frame, raw_df)
+            Tuple of (figure, total_amount, total_charges, total_transactions, frame, raw_df),
+            where figure is a zero-argument callable that builds the Plotly chart
         """
-        paybill_df = self.data.get("PayBillPayments", pd.DataFrame())
-
-        if paybill_df.empty:
-            return None, 0, 0, 0, pd.DataFrame(), pd.DataFrame()
-
-        # Separate payments from charges
-        payments = paybill_df[~paybill_df["is_charge"]]
-        charges = paybill_df[paybill_df["is_charge"]]
-
-        if payments.empty:
-            return None, 0, 0, 0, pd.DataFrame(), pd.DataFrame()
-
-        # Calculate totals
-        total_sent = payments["withdrawn"].sum()
-        total_charges = charges["withdrawn"].sum()
-        transaction_count = payments.nunique()["receipt_no"]
-
-        # Group by business and aggregate accounts
-        def agg_accounts(accounts):
-            unique_accounts = accounts.dropna().unique()
-            return ", ".join(unique_accounts) if len(unique_accounts) > 0 else ""
-
-        paybill_frame = (
-            payments.groupby("processed_entity")
-            .agg(
-                accounts=("account_no", agg_accounts),
-                count=("receipt_no", "count"),
-                amount=("withdrawn", "sum"),
-            )
-            .sort_values(by="count", ascending=False)
-            .reset_index()
-        )
-
-        # Create visualization
-        fig = create_horizontal_bar_chart(
-            data=paybill_frame,
-            y_col="processed_entity",
-            x_col="amount",
-            title="",
-        )
-
-        return (
-            fig,
-            total_sent,
-            total_charges,
-            transaction_count,
-            paybill_frame,
-            payments,
-        )
+        return self._analyze("PayBillPayments")
 
     def Pochi(self) -> Tuple:
         """
         Analyze Pochi transactions.
 
         Returns:
-            Tuple of (figure, total_amount, total_charges, total_transactions, frame, raw_df)
+            Tuple of (figure, total_amount, total_charges, total_transactions, frame, raw_df),
+            where figure is a zero-argument callable that builds the Plotly chart
         """
-        pochi_df = self.data.get("Pochi", pd.DataFrame())
-
-        if pochi_df.empty:
-            return None, 0, 0, 0, pd.DataFrame(), pd.DataFrame()
-
-        # Calculate totals
-        total_amount = pochi_df["withdrawn"].sum()
-        total_transactions = pochi_df["receipt_no"].nunique()
-
-        # Group by entity
-        pochi_frame = (
-            pochi_df.groupby("processed_entity")
-            .agg(
-                count=("receipt_no", "count"),
-                amount=("withdrawn", "sum"),
-            )
-            .sort_values(by="count", ascending=False)
-            .reset_index()
-        )
-
-        # Create visualization
-        fig = create_horizontal_bar_chart(
-            data=pochi_frame,
-            y_col="processed_entity",
-            x_col="amount",
-            title="",
-        )
-
-        return fig, total_amount, 0, total_transactions, pochi_frame, pochi_df
+        return self._analyze("Pochi")
 
     def CashWithdrawals(self) -> Tuple:
         """
         Analyze cash withdrawal transactions.
 
         Returns:
-            Tuple of (figure, total_amount, total_charges, total_transactions, frame, raw_df)
+            Tuple of (figure, total_amount, total_charges, total_transactions, frame, raw_df),
+            where figure is a zero-argument callable that builds the Plotly chart
         """
-        withdrawal_df = self.data.get("CashWithdrawals", pd.DataFrame())
-
-        if withdrawal_df.empty:
-            return None, 0, 0, 0, pd.DataFrame(), pd.DataFrame()
-
-        # Separate withdrawals from charges
-        withdrawals = withdrawal_df[~withdrawal_df["is_charge"]]
-        charges = withdrawal_df[withdrawal_df["is_charge"]]
-
-        if withdrawals.empty:
-            return None, 0, 0, 0, pd.DataFrame(), pd.DataFrame()
-
-        # Calculate totals
-        total_withdrawal = withdrawals["withdrawn"].sum()
-        total_charges = charges["withdrawn"].sum()
-        withdrawal_count = len(withdrawals)
-
-        # Group by location
-        withdrawal_frame = (
-            withdrawals.groupby("processed_entity")
-            .agg(
-                count=("receipt_no", "count"),
-                amount=("withdrawn", "sum"),
-            )
-            .sort_values(by="amount", ascending=False)
-            .reset_index()
-        )
-
-        # Create visualization
-        fig = create_horizontal_bar_chart(
-            data=withdrawal_frame,
-            y_col="processed_entity",
-            x_col="amount",
-            title="",
-        )
-
-        return (
-            fig,
-            total_withdrawal,
-            total_charges,
-            withdrawal_count,
-            withdrawal_frame,
-            withdrawals,
-        )
+        return self._analyze("CashWithdrawals")
 
     def airtime_bundle(self) -> Tuple:
         """
         Analyze airtime purchase transactions.
 
         Returns:
-            Tuple of (figure, total_amount, total_charges, total_transactions, frame, raw_df)
+            Tuple of (figure, total_amount, total_charges, total_transactions, frame, raw_df),
+            where figure is a zero-argument callable that builds the Plotly chart
         """
-        airtime_df = self.data.get("airtime_bundle", pd.DataFrame())
-
-        if airtime_df.empty:
-            return None, 0, 0, 0, pd.DataFrame(), pd.DataFrame()
-
-        # Calculate totals
-        total_airtime = airtime_df["withdrawn"].sum()
-        total_transactions = len(airtime_df)
-
-        # Group by provider
-        airtime_frame = (
-            airtime_df.groupby("processed_entity")
-            .agg(
-                count=("receipt_no", "count"),
-                amount=("withdrawn", "sum"),
-            )
-            .sort_values(by="amount", ascending=False)
-            .reset_index()
-        )
-
-        # Create pie chart for airtime (different from other analyses)
-        fig = create_pie_chart(
-            data=airtime_frame,
-            values_col="amount",
-            names_col="processed_entity",
-            title="",
-        )
-
-        return fig, total_airtime, 0, total_transactions, airtime_frame, airtime_df
+        return self._analyze("airtime_bundle")
 
 
 if __name__ == "__main__":
@@ -7,8 +7,7 @@ standardization.
 
 Functions:
 
-    split_details: Helper function to parse transaction details
-    split_type: Helper function to parse transaction types
+    parse_amounts: Helper function to parse amount columns
     
     load_pdf_data: Extracts transaction data from PDF statements
     clean_data: Cleans and standardizes the extracted data
@@ -38,9 +37,37 @@ EXPECTED_COLUMNS = [
     "Paid In",
     "Withdrawn",
 ]
+EXPECTED_COLUMN_SET = frozenset(EXPECTED_COLUMNS)
+
+# Normalized statement headers and the standardized names they are renamed to
+COLUMN_NAMES = {
+    "receiptno.": "receipt_no",
+    "receiptno": "receipt_no",
+    "completiontime": "date_time",
+    "details": "details",
+    "paidin": "paid_in",
+    "withdrawn": "withdrawn",
+    "withdraw": "withdrawn",
+}
+
+# Standardized columns kept after cleaning, in output order
+KEEP_COLUMNS = ["receipt_no", "date_time", "details", "paid_in", "withdrawn"]
+
+# Splits "Customer Transfer to - 0712***678 John Doe" into type and entity.
+# Written without lookarounds, which the RE2 engine behind Arrow's regex
+# kernels lacks. The type group keeps its trailing space, so callers strip
+# both groups. Kept as a plain string for the same reason as
+# AMOUNT_SEPARATORS below
+DETAILS_SPLIT = r"^(|.*?\s) *- *\s(\S.*)"
+
+# Whitespace runs, dropped from column names
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+# Thousands separators and stray whitespace in the amount columns. Kept as a
+# plain string: pandas only hands uncompiled patterns to the Arrow kernels
+AMOUNT_SEPARATORS = r"[,\s]"
 
 
-# @st.cache_data(show_spinner="Extracting and cleaning your statement...")
 # Step 1: Load and examine raw data
 def load_pdf_data(pdf_path: str, password: str) -> pd.DataFrame:
     """
@@ -64,16 +91,18 @@ def load_pdf_data(pdf_path: str, password: str) -> pd.DataFrame:
         selected_dfs = [
             df
             for df in df_list
-            if isinstance(df, pd.DataFrame) and df.columns.isin(EXPECTED_COLUMNS).any()]
+            if isinstance(df, pd.DataFrame) and not EXPECTED_COLUMN_SET.isdisjoint(df.columns)]
         print(f"\n✅ Found {len(selected_dfs)} transaction tables")
+        # Let the non-transaction tables go before the combined copy is allocated
+        del df_list
 
         if selected_dfs:
             combined_df = pd.concat(selected_dfs, ignore_index=True)
-            combined_df.columns = (
-                combined_df.columns.str.strip()
-                .str.lower()
-                .str.replace(r"\s+", "", regex=True)
-            )
+            selected_dfs.clear()
+            combined_df.columns = [
+                WHITESPACE_PATTERN.sub("", str(col).strip().lower())
+                for col in combined_df.columns
+            ]
             print(f"📈 Combined dataset shape: {combined_df.shape}")
             return combined_df
         else:
@@ -85,45 +114,34 @@ def load_pdf_data(pdf_path: str, password: str) -> pd.DataFrame:
         return pd.DataFrame()
 
 
-def split_details(details_text):
-    """
-    Parse transaction details into type and entity components.
-
-    Args:
-        details_text (str): Raw transaction details text
-
-    Returns:
-        tuple: Contains (transaction_type, entity_name)
+def parse_amounts(amounts: pd.Series, absolute: bool = False) -> np.ndarray:
     """
-    pattern = r"(.*?)(?<!\S)(?: *)-(?: *)\s(?=\S)(.*)"
-    match = re.search(pattern, str(details_text), re.IGNORECASE)
-
-    if match:
-        return match.group(1).strip(), match.group(2).strip()
-    else:
-        return details_text, details_text
-
+    Parse a raw amount column into floats, treating unparseable values as zero.
 
-def split_type(transaction_type):
-    """
-    Parse transaction type into class and description components.
+    Separators are stripped in one pass; blanks, "-", "N/A" and "nan" fail to
+    parse and become zero. The sign and NaN fixes are done in place on the
+    freshly parsed array, so no temporaries are allocated.
 
     Args:
-        transaction_type (str): Raw transaction type text
+        amounts (pd.Series): Raw amount column, e.g. "1,234.00"
+        absolute (bool): Drop the sign, for withdrawals shown as negatives
 
     Returns:
-        pd.Series: Contains [type_class, type_description]
+        np.ndarray: Parsed amounts as float64
     """
-    if pd.isna(transaction_type):
-        return pd.Series(["", ""])
-    else:
-        split_list = str(transaction_type).split(" ")
-        right = " ".join(split_list[0:4])
-        left = " ".join(split_list[4:])
-        return pd.Series([right, left])
+    # Arrow strings keep the strip in one native pass instead of building
+    # an object array of Python str first
+    stripped = amounts.astype("string[pyarrow]").str.replace(
+        AMOUNT_SEPARATORS, "", regex=True
+    )
+    # to_numeric returns int64 when every amount is integral; keep floats
+    values = pd.to_numeric(stripped.to_numpy(), errors="coerce").astype(float, copy=False)
+    if absolute:
+        np.abs(values, out=values)
+    values[np.isnan(values)] = 0
+    return values
 
 
-# @st.cache_data(show_spinner="Cleaning your M-Pesa data...")
 def clean_data(df: pd.DataFrame) -> pd.DataFrame:
     """
     Clean and standardize M-Pesa transaction data.
@@ -133,14 +151,11 @@ def clean_data(df: pd.DataFrame) -> pd.DataFrame:
 
     Returns:
         pd.DataFrame: Cleaned and standardized DataFrame with added columns:
-            - month: e.g., "July_25"
-            - week: e.g., "29_25"
-            - type_class: General transaction category
-            - type_desc: More specific transaction description
+            - month: e.g., "July_25" (categorical)
+            - week: e.g., "29_25" (categorical)
+            - type_class: General transaction category (categorical)
+            - type_desc: More specific transaction description (categorical)
     """
-    import streamlit as st
-    import pandas as pd
-
     print("\n🧹 Cleaning data...")
 
     if df is None or df.empty:
@@ -152,76 +167,70 @@ def clean_data(df: pd.DataFrame) -> pd.DataFrame:
 
     print(f"Original shape: {df.shape}")
 
-    df_clean = df.copy()
+    # No defensive copy: the drop/rename/select steps below each return a new
+    # frame, so the caller's DataFrame is never written to
+    df_clean = df
+
+    # Steps 1-3: Drop unexpected columns, rename the rest to standardized
+    # names and put them in order, in a single lookup pass over the headers
+    mapping = {col: COLUMN_NAMES[col] for col in df_clean.columns if col in COLUMN_NAMES}
+    cols_to_drop = [col for col in df_clean.columns if col not in mapping]
 
-    # Step 1: Drop columns not in expected list
-    expected = ('receiptno.', "receiptno", 'completiontime', 'details', 'transactionstatus', 'paidin', 'withdrawn', 'withdraw')
-    cols_to_drop = [col for col in df_clean.columns if col not in expected]
-    
     if cols_to_drop:
         print(f"🗑️ Dropping unexpected columns: {cols_to_drop}")
-        df_clean = df_clean.drop(columns=cols_to_drop)
-
-    # Step 2: Rename columns to standardized names
-    mapping = {}
-    for col in df_clean.columns:
-        lc = col.lower()
-        if "receipt" in lc or "ref" in lc:
-            mapping[col] = "receipt_no"
-        elif "completion" in lc or "time" in lc:
-            mapping[col] = "date_time"
-        elif "detail" in lc or "details" in lc:
-            mapping[col] = "details"
-        elif "paid" in lc and "in" in lc:
-            mapping[col] = "paid_in"
-        elif "withdrawn" in lc or 'withdr' in lc:
-            mapping[col] = "withdrawn"
 
     print(f"📝 Renaming columns using mapping: {mapping}")
-    df_clean = df_clean.rename(columns=mapping)
-
-    # Step 3: Keep only necessary renamed columns
-    keep_cols = ["receipt_no", "date_time", "details", "paid_in", "withdrawn"]
-    df_clean = df_clean[[col for col in keep_cols if col in df_clean.columns]]
+    # Select before renaming so only the kept columns are carried forward
+    kept = sorted(mapping, key=lambda col: KEEP_COLUMNS.index(mapping[col]))
+    df_clean = df_clean[kept].rename(columns=mapping)
 
     # Step 4: Standardize and clean column values
-    df_clean["receipt_no"] = df_clean["receipt_no"].astype("string")
-    df_clean["date_time"] = pd.to_datetime(df_clean["date_time"], errors="coerce")
-
-    df_clean["withdrawn"] = (
-        pd.to_numeric(
-            df_clean["withdrawn"]
-            .astype(str)
-            .str.replace(",", "")
-            .replace(["", "-", "N/A", "nan"], "0"),
-            errors="coerce",
-        )
-        .abs()
-        .fillna(0)
+    # Arrow-backed strings keep the text contiguous for the str kernels below
+    df_clean = df_clean.astype(
+        {"receipt_no": "string[pyarrow]", "details": "string[pyarrow]"}
     )
+    df_clean["date_time"] = pd.to_datetime(df_clean["date_time"], errors="coerce")
 
-    df_clean["paid_in"] = pd.to_numeric(
-        df_clean["paid_in"]
-        .astype(str)
-        .str.replace(",", "")
-        .replace(["", "-", "N/A", "nan"], "0"),
-        errors="coerce",
-    ).fillna(0)
+    df_clean["withdrawn"] = parse_amounts(df_clean["withdrawn"], absolute=True)
+    df_clean["paid_in"] = parse_amounts(df_clean["paid_in"])
 
     df_clean["details"] = df_clean["details"].str.replace(r"\s+", " ", regex=True)
 
     # Step 5: Extract type/entity and classify transactions
-    df_clean[["type", "entity"]] = df_clean["details"].apply(
-        lambda x: pd.Series(split_details(x))
+    # One Arrow regex pass splits the details at " - ";
+    # rows without a " - " separator keep the full details in both columns
+    details_parts = df_clean["details"].str.extract(DETAILS_SPLIT)
+    df_clean["type"] = details_parts[0].str.strip().fillna(df_clean["details"])
+    df_clean["entity"] = details_parts[1].str.strip().fillna(df_clean["details"])
+
+    # A type's first four words are its class, the rest its description.
+    # Statements repeat a few dozen type strings, so split each distinct one
+    # and broadcast the parts back with the factorize codes.
+    # All three columns are low cardinality and kept as categoricals;
+    # details and entity are close to unique per row and stay strings
+    type_codes, types = pd.factorize(df_clean["type"].fillna(""))
+    type_words = [text.split(" ", 4) for text in types]
+    type_class = pd.Categorical([" ".join(words[:4]) for words in type_words])
+    type_desc = pd.Categorical([words[4] if len(words) > 4 else "" for words in type_words])
+    df_clean["type"] = df_clean["type"].astype("category")
+    df_clean["type_class"] = type_class[type_codes]
+    df_clean["type_desc"] = type_desc[type_codes]
+
+    # Step 6: Add formatted time columns, keyed on integer periods so each
+    # distinct month/week is formatted once and stored as a categorical
+    month_codes, months = pd.factorize(df_clean["date_time"].dt.to_period("M"))
+    df_clean["month"] = pd.Categorical.from_codes(
+        month_codes, categories=months.strftime("%B_%y")
     )
 
-    df_clean[["type_class", "type_desc"]] = df_clean["type"].apply(
-        lambda x: pd.Series(split_type(x))
+    week_key = (
+        df_clean["date_time"].dt.isocalendar()["week"].astype("Int64") * 100
+        + df_clean["date_time"].dt.year.astype("Int64") % 100
+    )
+    week_codes, weeks = pd.factorize(week_key)
+    df_clean["week"] = pd.Categorical.from_codes(
+        week_codes, categories=[f"{key // 100:02d}_{key % 100:02d}" for key in weeks]
     )
-
-    # Step 6: Add formatted time columns
-    df_clean["month"] = df_clean["date_time"].dt.strftime("%B_%y")
-    df_clean["week"] = df_clean["date_time"].dt.strftime("%V_%y")
 
     print(f"✅ Cleaned shape: {df_clean.shape}")
     print(f"🧾 Final columns: {list(df_clean.columns)}")
@@ -6,11 +6,14 @@
 # IMPORTS
 # ============================================================================
 
+import hashlib
+import io
 import streamlit as st
 import pandas as pd
+import numpy as np
 from load_wrangle import load_pdf_data, clean_data
 from efficient_analysis import Analyzer
-from typing import Tuple, Any
+from typing import Dict, Tuple, Any
 from transaction_categorizer import categorize_transactions_efficiently
 from ui_components import create_transaction_tab, create_full_transaction_expander
 
@@ -21,6 +24,12 @@ display_columns = ["receipt_no", "date_time", "details", "paid_in", "withdrawn"]
 # CONFIGURATION
 # ============================================================================
 
+# Copy-on-Write lets rename/select in clean_data share the raw columns
+# instead of copying them. Set here, for the app process only; always on
+# from pandas 3, where the option is deprecated
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
 # App configuration
 st.set_page_config(
     layout="wide", page_title="M-pesalytics: M-Pesa Statement Analyzer", page_icon="💸"
@@ -188,11 +197,21 @@ with st.expander(
 # ============================================================================
 
 
-@st.cache_data(show_spinner="Extracting and cleaning your statement...")
 def load_and_clean(pdf_file: Any, password: str) -> Tuple:
+    """Load and clean an uploaded PDF, cached on a digest of its bytes"""
+    pdf_bytes = pdf_file.getvalue()
+    return _load_and_clean_cached(
+        hashlib.sha256(pdf_bytes).hexdigest(), pdf_bytes, password
+    )
+
+
+@st.cache_data(show_spinner="Extracting and cleaning your statement...")
+def _load_and_clean_cached(pdf_digest: str, _pdf_bytes: bytes, password: str) -> Tuple:
     """Load and clean PDF data with error handling"""
+    # pdf_digest is the cache key; the leading underscore keeps Streamlit
+    # from hashing the raw bytes again on every rerun
     try:
-        df = load_pdf_data(pdf_file, password)
+        df = load_pdf_data(io.BytesIO(_pdf_bytes), password)
 
         df_cleaned = clean_data(df)
         return df_cleaned, None
@@ -213,10 +232,16 @@ def faux_data_clean() -> pd.DataFrame:
 def categorize_data(df_cleaned):
     """Categorize transactions efficiently with error handling"""
     try:
-        return categorize_transactions_efficiently(df_cleaned), None
+        categorized = categorize_transactions_efficiently(df_cleaned)
     except Exception as e:
         return None, str(e)
 
+    # Month periods are computed once here so the month filter only runs
+    # isin on integer ordinals on each rerun. Every category frame is a
+    # slice of the master frame, so the column goes on that once
+    categorized.frame["_month_key"] = categorized.frame["date_time"].dt.to_period("M")
+    return categorized, None
+
 
 @st.cache_data(show_spinner="Applying filters to categorized data...")
 def filter_categorized_data(categorized_data, date_filter=None, month_filter=None):
@@ -225,34 +250,66 @@ def filter_categorized_data(categorized_data, date_filter=None, month_filter=Non
         return categorized_data
 
     filtered_categories = {}
+    if month_filter:
+        # Labels look like "June_2024"; parse them once, not per category
+        month_periods = pd.to_datetime(month_filter, format="%B_%Y").to_period("M")
 
     for category, df in categorized_data.items():
         if df.empty:
             filtered_categories[category] = df
             continue
 
-        filtered_df = df.copy()
+        # No copy up front: .loc with a mask already returns a new frame
+        filtered_df = df
 
         # Apply date range filter
         if date_filter and len(date_filter) == 2:
             start_date, end_date = date_filter
-            mask = (filtered_df["date_time"] >= pd.to_datetime(start_date)) & (
-                filtered_df["date_time"] <= pd.to_datetime(end_date)
+            dates = df["date_time"].to_numpy()
+            mask = (dates >= np.datetime64(start_date)) & (
+                dates <= np.datetime64(end_date)
             )
-            filtered_df = filtered_df.loc[mask]
+            filtered_df = df.loc[mask]
 
         # Apply month filter
         elif month_filter:
-            month_mask = (
-                filtered_df["date_time"].dt.strftime("%B_%Y").isin(month_filter)
-            )
-            filtered_df = filtered_df.loc[month_mask]
+            month_mask = df["_month_key"].isin(month_periods)
+            filtered_df = df.loc[month_mask]
 
         filtered_categories[category] = filtered_df
 
     return filtered_categories
 
 
+@st.cache_data(show_spinner="Analyzing transactions...")
+def analyze_data(categorized_data, date_filter=None, month_filter=None) -> Dict[str, Tuple]:
+    """Filter and analyze every category, cached on the data and filters across reruns"""
+    # Keyed on the filter values rather than the filtered frames, which
+    # cost more to hash on each rerun than the analyses take to run
+    filtered_categorized_data = filter_categorized_data(
+        categorized_data, date_filter=date_filter, month_filter=month_filter
+    )
+    if filtered_categorized_data is None:
+        return None  # type: ignore
+
+    analyzer = Analyzer(filtered_categorized_data)
+    return {
+        name: getattr(analyzer, name)()
+        for name in (
+            "BuyGoodsPayments",
+            "PayBillPayments",
+            "SendMoney",
+            "ReceivedMoney",
+            "Deposit",
+            "CashWithdrawals",
+            "ReceivedMoney_business",
+            "Pochi",
+            "Pochi_in",
+            "airtime_bundle",
+        )
+    }
+
+
 # ============================================================================
 # DATA LOADING AND PROCESSING
 # ============================================================================
@@ -269,8 +326,10 @@ if st.session_state.get("process_clicked") and st.session_state.pdf_path:
         st.stop()
 
     if not df_cleaned is None:
-        startDate = df_cleaned["date_time"].min().strftime("%b %d, %Y")
-        endDate = df_cleaned["date_time"].max().strftime("%b %d, %Y")
+        # Scan the dates once; the sidebar reuses these bounds
+        date_min, date_max = df_cleaned["date_time"].agg(["min", "max"])
+        startDate = date_min.strftime("%b %d, %Y")
+        endDate = date_max.strftime("%b %d, %Y")
 
     # Categorize transactions
     
@@ -283,8 +342,9 @@ if st.session_state.get("process_clicked") and st.session_state.pdf_path:
 
 elif st.session_state.get("faux_data_clicked"):
     df_cleaned = faux_data_clean() 
-    startDate = df_cleaned["date_time"].min().strftime("%b %d, %Y")
-    endDate = df_cleaned["date_time"].max().strftime("%b %d, %Y")
+    date_min, date_max = df_cleaned["date_time"].agg(["min", "max"])
+    startDate = date_min.strftime("%b %d, %Y")
+    endDate = date_max.strftime("%b %d, %Y")
 
     # Categorize transactions
     categorized_data, categorize_error = categorize_data(df_cleaned)
@@ -337,12 +397,9 @@ with st.sidebar:
     if st.session_state.get("date_filter") and not df_cleaned.empty:
         date_range = st.date_input(
             "Select Date Range",
-            value=[
-                df_cleaned["date_time"].min().date(),
-                df_cleaned["date_time"].max().date(),
-            ],
-            min_value=df_cleaned["date_time"].min().date(),
-            max_value=df_cleaned["date_time"].max().date(),
+            value=[date_min.date(), date_max.date()],
+            min_value=date_min.date(),
+            max_value=date_max.date(),
         )
         if len(date_range) == 2:
             date_filter_value = date_range
@@ -351,14 +408,11 @@ with st.sidebar:
 
     # Month filter
     elif st.session_state.get("month_filter") and not df_cleaned is None:
-        month_list = list(df_cleaned["date_time"].dt.month_name()
-                                + "_"
-                                + df_cleaned["date_time"].dt.year.astype(str)
-        )
-        month_list = sorted(
-            set(month_list),
-            key=lambda x: pd.to_datetime(x.split("_")[0] + " 1, " + x.split("_")[1]),
-        )
+        # Sort the distinct month periods, then format only those
+        months = pd.PeriodIndex(
+            df_cleaned["date_time"].dropna().dt.to_period("M").unique()
+        ).sort_values()
+        month_list = list(months.strftime("%B_%Y"))
         # Default to first three months when toggle is enabled
         default_months = month_list[:3] if len(month_list) >= 3 else month_list
         month_filter_value = st.segmented_control(
@@ -372,37 +426,37 @@ with st.sidebar:
     else:
         st.info(f"💡 Showing all data from {startDate} to {endDate}")  # type: ignore
 
-# Apply filters to categorized data
-filtered_categorized_data = filter_categorized_data(categorized_data, date_filter=date_filter_value, month_filter=month_filter_value)
+# Apply filters and analyze every category; Streamlit reruns with the same
+# filters reuse the results
+analyses = analyze_data(
+    categorized_data, date_filter=date_filter_value, month_filter=month_filter_value
+)
 st.divider()
 
-# Ensure filtered_categorized_data is not None before initializing Analyzer
-if filtered_categorized_data is None:
+# Ensure the filtered data was analyzed before building the UI
+if analyses is None:
     st.error("An error occurred while filtering categorized data.")
     st.stop()
 
-# Initialize analyzer
-analysisBot = Analyzer(filtered_categorized_data)
-
 # ============================================================================
 # TRANSACTION ANALYSIS - GET ALL DATA
 # ============================================================================
 
 # Get all transaction analysis with standardized returns
 buygoods_fig, bg_spend, bg_charges, bg_transactions, buygoodsFrame, buygoods_df = (
-    analysisBot.BuyGoodsPayments()
+    analyses["BuyGoodsPayments"]
 )
 paybill_fig, pb_spend, pb_charges, pb_transactions, paybillFrame, paybill_df = (
-    analysisBot.PayBillPayments()
+    analyses["PayBillPayments"]
 )
 transfer_fig, tr_spend, tr_charges, tr_transactions, transferFrame, transfer_df = (
-    analysisBot.SendMoney()
+    analyses["SendMoney"]
 )
 receive_fig, rc_amount, rc_charges, rc_transactions, receiveFrame, receive_df = (
-    analysisBot.ReceivedMoney()
+    analyses["ReceivedMoney"]
 )
 deposits_fig, dp_amount, dp_charges, dp_transactions, depositFrame, deposit_df = (
-    analysisBot.Deposit()
+    analyses["Deposit"]
 )
 (
     withdrawal_fig,
@@ -411,7 +465,7 @@ deposits_fig, dp_amount, dp_charges, dp_transactions, depositFrame, deposit_df =
     wd_transactions,
     withdrawalFrame,
     withdrawal_df,
-) = analysisBot.CashWithdrawals()
+) = analyses["CashWithdrawals"]
 
 (
     received_business_fig,
@@ -420,10 +474,10 @@ deposits_fig, dp_amount, dp_charges, dp_transactions, depositFrame, deposit_df =
     rb_transactions,
     received_businessFrame,
     received_business_df,
-) = analysisBot.ReceivedMoney_business()
+) = analyses["ReceivedMoney_business"]
 
 pochi_fig, pochi_spend, pochi_charges, pochi_transactions, pochiFrame, pochi_df = (
-    analysisBot.Pochi()
+    analyses["Pochi"]
 )
 (
     pochi_in_fig,
@@ -432,7 +486,7 @@ pochi_fig, pochi_spend, pochi_charges, pochi_transactions, pochiFrame, pochi_df
     pochi_in_transactions,
     pochi_inFrame,
     pochi_in_df,
-) = analysisBot.Pochi_in()
+) = analyses["Pochi_in"]
 (
     airtime_fig,
     airtime_amount,
@@ -440,7 +494,7 @@ pochi_fig, pochi_spend, pochi_charges, pochi_transactions, pochiFrame, pochi_df
     airtime_transactions,
     airtimeFrame,
     airtime_df,
-) = analysisBot.airtime_bundle()
+) = analyses["airtime_bundle"]
 
 # ============================================================================
 # USER INTERFACE - MONEY OUT SECTION
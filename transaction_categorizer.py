@@ -3,360 +3,489 @@ Efficient Single-Pass Transaction Categorizer.
 
 """
 
+import numpy as np
 import pandas as pd
 import re
-from typing import Dict, Tuple
+from typing import Dict, Mapping, Tuple
+
+# "<business> via <channel> ... is <extra info>"; whitespace is collapsed
+# upstream, so _split_businesses only needs this for non-ASCII text
+BUSINESS_PAYMENT_PATTERN = re.compile(
+    r"(.*?)(?:\s+(?:via).*?(?:is)\s+(.*)|$)", re.IGNORECASE
+)
+
+# The literal " via ... is " search as a plain pattern string, so it can run
+# on the Arrow regex kernels
+BUSINESS_VIA_INFO = r"(?is)^(.*?) via.*?is (.*)$"
+
+# Categories whose counterparty may be a person or a business
+ENTITY_SPLIT_CATEGORIES = (
+    "ReceivedMoney",
+    "ReceivedMoney_business",
+    "Pochi_in",
+    "businessPayment_fromOtherSME",
+    "businessPayment_toCustomer",
+)
+
+# Categories whose counterparty is a masked phone number followed by a name
+MASKED_PHONE_CATEGORIES = ("SendMoney", "Pochi", "airtime_bundle")
+
+# Columns read by get_category_summary
+SUMMARY_COLUMNS = ["receipt_no", "withdrawn", "paid_in", "processed_entity", "date_time"]
+
+# Column that names the charge, for the categories that have charge rows
+CHARGE_COLUMNS = {
+    "HustlerFund": "type_class",
+    "SendMoney": "type_desc",
+    "BuyGoodsPayments": "type_class",
+    "PayBillPayments": "type_class",
+    "CashWithdrawals": "details",
+}
+
+# Categories that carry an account_no column
+ACCOUNT_CATEGORIES = frozenset(ENTITY_SPLIT_CATEGORIES + ("PayBillPayments",))
+
+
+def _contains_any(column: pd.Series, *needles: str) -> np.ndarray:
+    """Rows of a string column containing any of the literal needles."""
+    if len(needles) == 1:
+        return column.str.contains(needles[0], regex=False).to_numpy(dtype=bool)
+    # An alternation of escaped literals compiles to a single DFA in Arrow's
+    # regex engine, so the column is scanned once for all needles
+    pattern = "|".join(re.escape(needle) for needle in needles)
+    return column.str.contains(pattern).to_numpy(dtype=bool)
+
+
+def _split_masked_phones(entities: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Split masked phone numbers from names in a column of non-missing entities.
 
+    Args:
+        entities: Entity strings, e.g. "0712***678 John Doe"
 
-class TransactionCategorizer:
+    Returns:
+        Tuple of (names, phones) arrays, title-cased. Entities without a
+        masked number keep the whole string as the name and no phone
     """
-    A class to categorize M-Pesa transactions
+    if entities.empty:
+        return np.empty(0, dtype=object), np.empty(0, dtype=object)
+
+    masked = entities.str.contains("*", regex=False).to_numpy(dtype=bool)
+    # Same split as entity.split(" ", 1), as two anchored regex replaces;
+    # unlike split(n=1) these stay on the Arrow kernels
+    phones = entities.str.replace(r"(?s) .*", "", regex=True)
+    names = entities.str.replace(r"^[^ ]* ?", "", regex=True)
+    names = names.where(masked, entities).str.title()
+    phones = phones.where(masked, "").str.title()
+    return names.to_numpy(dtype=object), phones.to_numpy(dtype=object)
+
+
+def _split_businesses(entities: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
     """
+    Split business names from extra info in a column of non-missing entities.
 
-    def __init__(self):
-        """Initialize the categorizer with default categories."""
-        self.categories = {
-            # Money in
-            "ReceivedMoney": [],
-            "ReceivedMoney_business": [],
-            "Deposit": [],
-            "Pochi_in": [],
-            "Reversals": [],  # Inward and Outward
-            "HustlerFund": [],
-            "KCB": [],  # Inward and Outward
-            "MShwari": [],  # Inward and Outward
-            "businessPayment_fromOtherSME": [],
-            # Money Out
-            "SendMoney": [],
-            "businessPayment_toCustomer": [],
-            "Overdraft": [],
-            "BuyGoodsPayments": [],
-            "PayBillPayments": [],
-            "Pochi": [],
-            "CashWithdrawals": [],
-            "airtime_bundle": [],
-            "NoDetails": [],
-            "uncategorized": [],
-        }
+    Args:
+        entities: Entity strings, e.g. "Equity Bulk Account via Equity Bank is 12345"
 
-        # Regex patterns for entity processing (compiled once for efficiency)
-        self.masked_phone_pattern = re.compile(r"\*+")
-        self.paybill_pattern = re.compile(r"(.*?)(?:\s+Acc\.\s+(.*)|$)")
-        self.business_payment_pattern = re.compile(
-            r"(.*?)(?:\s+(?:via).*?(?:is)\s+(.*)|$)", re.IGNORECASE
-        )
+    Returns:
+        Tuple of (business_names, extra_info) arrays. Entities without
+        "via ... is" keep the whole string as the name and no extra info
+    """
+    # Case-insensitive: the first " via" and the first "is " after it.
+    # Arrow's case folding is only relied on for ASCII text; anything else
+    # goes through BUSINESS_PAYMENT_PATTERN on Python's re
+    parts = entities.str.extract(BUSINESS_VIA_INFO)
+    matched = parts[0].notna()
+    names = parts[0].where(matched, entities)
+    info = parts[1].where(matched, "")
+
+    non_ascii = entities.str.contains(r"[^\x00-\x7f]").to_numpy(dtype=bool)
+    if non_ascii.any():
+        fallback = entities[non_ascii].str.extract(BUSINESS_PAYMENT_PATTERN)
+        names[non_ascii] = fallback[0]
+        info[non_ascii] = fallback[1].fillna("")
+    return (
+        names.str.strip().to_numpy(dtype=object),
+        info.str.strip().to_numpy(dtype=object),
+    )
 
-    def add_category(self, category_name: str):
-        """Add a new transaction category to the categorizer."""
-        if category_name not in self.categories:
-            self.categories[category_name] = []
 
-    def process_masked_phone(self, entity: str) -> tuple:
-        """
-        Process masked phone numbers to extract names.
+def _split_entities(entities: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Split counterparties that may be a person or a business.
 
-        Args:
-            entity: Raw entity string (e.g., "2547******09 John Doe")
+    Entities starting with a digit are a masked phone number and a name;
+    anything else is a business name with optional extra info.
 
-        Returns:
-            Cleaned entity name (e.g., "John Doe")
-        """
-        if pd.isna(entity) or entity == "":
-            return entity, ""
+    Args:
+        entities: Non-missing entity strings
 
-        # Check if it contains masked numbers (asterisks)
-        if self.masked_phone_pattern.search(entity):
-            # Extract name part after phone number
-            parts = entity.split(" ", 1)
-            return parts[1].title(), parts[0].title()
+    Returns:
+        Tuple of (names, accounts) arrays: the phone number or extra info
+        goes in accounts
+    """
+    names = np.empty(len(entities), dtype=object)
+    accounts = np.empty(len(entities), dtype=object)
+    numeric_start = _starts_with_digits(entities, 1)
+    names[numeric_start], accounts[numeric_start] = _split_masked_phones(
+        entities[numeric_start]
+    )
+    names[~numeric_start], accounts[~numeric_start] = _split_businesses(
+        entities[~numeric_start]
+    )
+    return names, accounts
 
-        return entity.title(), ""
 
-    def process_business_and_account(self, entity: str) -> tuple:
-        """_summary_
+def _split_paybills(entities: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Split business names from account numbers in a column of non-missing entities.
 
-        Args:
-            entity (str): _description_
+    Args:
+        entities: Entity strings, e.g. "Kenya Power Acc. 123456"
 
-        Returns:
-            str: _description_
-        """
-        if pd.isna(entity) or entity == "":
-            return entity, ""
+    Returns:
+        Tuple of (business_names, account_numbers) arrays
+    """
+    # Split at the first " Acc. ", like str.partition
+    parts = entities.str.extract(r"(?s)^(.*?) Acc\. (.*)$")
+    matched = parts[0].notna()
+    names = parts[0].where(matched, entities).str.strip()
+    accounts = parts[1].where(matched, "").str.strip()
+    return names.to_numpy(dtype=object), accounts.to_numpy(dtype=object)
 
-        # Check if it contains masked numbers (asterisks)
-        if self.business_payment_pattern.search(entity):
-            match = self.business_payment_pattern.search(entity)
-            if match:
-                business_name = match.group(1).strip() if match.group(1) else ""
-                extra_info = match.group(2).strip() if match.group(2) else ""
 
-                return business_name, extra_info
-            return entity, ""
-        return entity, ""
+def _starts_with_digits(entities: pd.Series, width: int) -> np.ndarray:
+    """Rows whose first width characters are all numeric, like entity[0:width].isnumeric()."""
+    return entities.str[0:width].str.isnumeric().to_numpy(dtype=bool)
 
-    def extract_paybill_details(self, entity: str) -> Tuple[str, str]:
-        """
-        Extract business name and account number from paybill entity.
 
-        Args:
-            entity: Raw entity string (e.g., "Kenya Power Acc. 123456")
+def _lowercase_categorical(column: pd.Series) -> pd.Series:
+    """
+    Lowercase a low-cardinality text column into a categorical.
 
-        Returns:
-            Tuple of (business_name, account_number)
+    Each distinct value is lowercased once, and the .str and == tests on the
+    result run over the categories and integer codes instead of every row.
+    Missing values become "nan", like str() would give.
+    """
+    codes, uniques = pd.factorize(column, use_na_sentinel=False)
+    lowered = pd.Index(np.asarray(uniques).astype(str)).str.lower()
+    return pd.Series(pd.Categorical(lowered)[codes], index=column.index)
+
+
+def _equals(column: pd.Series, value: str) -> np.ndarray:
+    """Rows of a string column equal to value."""
+    return (column == value).to_numpy(dtype=bool)
+
+
+class CategoryView(Mapping):
+    """
+    Read-only mapping of category names to DataFrames over one master frame.
+
+    The master frame holds every categorized transaction sorted by category,
+    so each category is a contiguous row slice of it. Category frames are
+    built on access and share the master's data rather than holding a copy.
+    Columns added to the master frame show up in every category.
+    """
+
+    def __init__(self, frame: pd.DataFrame, bounds: Dict[str, Tuple[int, int]]):
         """
-        if pd.isna(entity) or entity == "":
-            return entity, ""
+        Args:
+            frame: All transactions, sorted by category
+            bounds: Start and stop row of each category in frame
+        """
+        self.frame = frame
+        self._bounds = bounds
+
+    def __getitem__(self, category: str) -> pd.DataFrame:
+        start, stop = self._bounds[category]
+        if start == stop:
+            return pd.DataFrame()
 
-        match = self.paybill_pattern.search(entity)
+        category_df = self.frame.iloc[start:stop].reset_index(drop=True)
+        if category not in ACCOUNT_CATEGORIES:
+            category_df = category_df.drop(columns="account_no")
+        if category == "NoDetails":
+            # Rows without details carry no charge flag at all
+            category_df["is_charge"] = ""
+        # Keep only this category's values, so other categories' entities
+        # (the uncategorized tuples among them) never reach display or Arrow
+        for col in ("processed_entity", "receipt_no"):
+            category_df[col] = category_df[col].cat.remove_unused_categories()
+        return category_df
 
-        if match:
-            business_name = match.group(1).strip()
-            account_no = match.group(2).strip() if match.group(2) else ""
-            return business_name, account_no
+    def __iter__(self):
+        return iter(self._bounds)
 
-        return entity, ""
+    def __len__(self) -> int:
+        return len(self._bounds)
 
-    def categorize_transaction(self, row: pd.Series) -> Dict:
+    def __reduce__(self):
+        # Pickled and cache-hashed as its master frame and bounds
+        return CategoryView, (self.frame, self._bounds)
+
+
+class TransactionCategorizer:
+    """
+    A class to categorize M-Pesa transactions
+    """
+
+    def __init__(self, verbose: bool = False):
         """
-        Categorize a single transaction and process its entity.
+        Initialize the categorizer with default categories.
 
         Args:
-            row: DataFrame row containing transaction data
+            verbose: Print progress and per-category counts while categorizing
+        """
+        self.verbose = verbose
+        self.categories = [
+            # Money in
+            "ReceivedMoney",
+            "ReceivedMoney_business",
+            "Deposit",
+            "Pochi_in",
+            "Reversals",  # Inward and Outward
+            "HustlerFund",
+            "KCB",  # Inward and Outward
+            "MShwari",  # Inward and Outward
+            "businessPayment_fromOtherSME",
+            # Money Out
+            "SendMoney",
+            "businessPayment_toCustomer",
+            "Overdraft",
+            "BuyGoodsPayments",
+            "PayBillPayments",
+            "Pochi",
+            "CashWithdrawals",
+            "airtime_bundle",
+            "NoDetails",
+            "uncategorized",
+        ]
 
-        Returns:
-            Dictionary with categorized and processed transaction data
+    def add_category(self, category_name: str):
+        """Add a new transaction category to the categorizer."""
+        if category_name not in self.categories:
+            self.categories.append(category_name)
+
+    def _category_masks(
+        self, details: pd.Series, type_desc: pd.Series, type_class: pd.Series
+    ) -> Dict[str, np.ndarray]:
         """
-        type_class = str(row["type_class"]).lower()
-        type_desc = str(row["type_desc"]).lower()
-        entity = str(row["entity"])
-        details = str(row["details"]).lower()
-
-        # Base transaction data
-        transaction_data = {
-            "receipt_no": row["receipt_no"],
-            "date_time": row["date_time"],
-            "details": row["details"],
-            "paid_in": row["paid_in"],
-            "withdrawn": row["withdrawn"],
-            "entity": entity,
-            "type_class": row["type_class"],
-            "type_desc": row["type_desc"],
-            "month": row["month"],
-            "week": row["week"],
-            "processed_entity": entity,
-            "is_charge": False,
-            "category": None,
-            "subcategory": None,
-        }
+        Build one boolean mask per category from the lowercased text columns.
 
-        # Match/case categorization with entity processing
-        # Match on a tuple of columns for more flexibility
-        # Ordered to match self.categories sequence
-        match (details, type_desc, type_class):
+        The masks are listed in the order the rules are tried, so the first
+        matching mask decides a row's category.
 
-            # Money In Categories
-            case (x, y, z) if "funds received from" in z and not y.isalnum():
-                transaction_data["category"] = "ReceivedMoney"
-                transaction_data["is_charge"] = False
-                name, account = (
-                    # expecting only individuals but just incase.
-                    self.process_masked_phone(entity)
-                    if entity[0:1].isnumeric()
-                    else self.process_business_and_account(entity)
-                )
-                transaction_data["processed_entity"] = name
-                transaction_data["account_no"] = account
-
-            case (x, y, z) if (
-                "merchant customer payment from" == z
-                or "salary payment from" in z
-                or "promotion payment from" in z
-                or "business payment from" in z
-                or "funds received from business" in z
-            ):
-                transaction_data["category"] = "ReceivedMoney_business"
-                transaction_data["is_charge"] = False
-                name, account = (
-                    self.process_masked_phone(entity)
-                    if entity[0:1].isnumeric()
-                    else self.process_business_and_account(entity)
-                )
-                transaction_data["processed_entity"] = name
-                transaction_data["account_no"] = account
-
-            case (x, y, z) if "deposit of" in x:
-                transaction_data["category"] = "Deposit"
-                transaction_data["subcategory"] = "deposit"
-
-            case (x, y, z) if z == "customer payment to small" and y == "business from":
-                transaction_data["category"] = "Pochi_in"
-                transaction_data["is_charge"] = False
-                name, account = (
-                    self.process_masked_phone(entity)
-                    if entity[0:1].isnumeric()
-                    else self.process_business_and_account(entity)
-                )
-                transaction_data["processed_entity"] = name
-                transaction_data["account_no"] = account
-
-            case (x, y, z) if "reversal" in x:
-                transaction_data["category"] = "Reversals"
-                transaction_data["subcategory"] = ()
-
-            case (x, y, z) if "term loan" in x:
-                transaction_data["category"] = "HustlerFund"
-                transaction_data["subcategory"] = y
-                transaction_data["is_charge"] = "charge" in z
-
-            case (x, y, z) if "kcb m-pesa" in x:
-                transaction_data["category"] = "KCB"
-                transaction_data["subcategory"] = y
-
-            case (x, y, z) if "m-shwari" in x:
-                transaction_data["category"] = "MShwari"
-                transaction_data["subcategory"] = "mshwari"
-
-            case (x, y, z) if (
-                "small business transfer to" in z and "other small business from" in y
-            ):
-                transaction_data["category"] = "businessPayment_fromOtherSME"
-                transaction_data["is_charge"] = False
-                name, account = (
-                    self.process_masked_phone(entity)
-                    if entity[0:1].isnumeric()
-                    else self.process_business_and_account(entity)
-                )
-                transaction_data["processed_entity"] = name
-                transaction_data["account_no"] = account
+        Args:
+            details: Lowercased transaction details, "nan" where missing
+            type_desc: Lowercased type descriptions
+            type_class: Lowercased type classes
 
+        Returns:
+            Dictionary mapping category names to boolean masks
+        """
+        x, y, z = details, type_desc, type_class
+        return {
+            # Money In Categories
+            "ReceivedMoney": _contains_any(z, "funds received from")
+            & ~y.str.isalnum().to_numpy(dtype=bool),
+            "ReceivedMoney_business": _equals(z, "merchant customer payment from")
+            | _contains_any(
+                z,
+                "salary payment from",
+                "promotion payment from",
+                "business payment from",
+                "funds received from business",
+            ),
+            "Deposit": _contains_any(x, "deposit of"),
+            "Pochi_in": _equals(z, "customer payment to small")
+            & _equals(y, "business from"),
+            "Reversals": _contains_any(x, "reversal"),
+            "HustlerFund": _contains_any(x, "term loan"),
+            "KCB": _contains_any(x, "kcb m-pesa"),
+            "MShwari": _contains_any(x, "m-shwari"),
+            "businessPayment_fromOtherSME": _contains_any(z, "small business transfer to")
+            & _contains_any(y, "other small business from"),
             # Money Out Categories
-            case (x, y, z) if (
-                "customer transfer" in x
-                or "send money" in x
-                or "transfer to other small business to" in x
-            ):
-                transaction_data["category"] = "SendMoney"
-                transaction_data["is_charge"] = "charge" in y
-                transaction_data["subcategory"] = (
-                    "charge" if transaction_data["is_charge"] else "transfer"
-                )
-                transaction_data["processed_entity"] = self.process_masked_phone(
-                    entity
-                )[0]
-
-            case (x, y, z) if z == "small business payment to":
-                transaction_data["category"] = "businessPayment_toCustomer"
-                transaction_data["is_charge"] = False
-                name, account = (
-                    self.process_masked_phone(entity)
-                    if entity[0:1].isnumeric()
-                    else self.process_business_and_account(entity)
-                )
-                transaction_data["processed_entity"] = name
-                transaction_data["account_no"] = account
-
-            case (x, y, z) if "overdraft" in x or "od loan" in x:
-                transaction_data["category"] = "Overdraft"
-                transaction_data["subcategory"] = "overdraft"
-
-            case (x, y, z) if "merchant payment" in x or "pay merchant" in x:
-                transaction_data["category"] = "BuyGoodsPayments"
-                transaction_data["is_charge"] = "charge" in z
-                transaction_data["subcategory"] = (
-                    "charge" if transaction_data["is_charge"] else ""
-                )
-
-            case (x, y, z) if "pay bill" in x:
-                transaction_data["category"] = "PayBillPayments"
-                transaction_data["is_charge"] = "charge" in z
-                transaction_data["subcategory"] = (
-                    "charge" if transaction_data["is_charge"] else ""
-                )
-                business_name, account_no = self.extract_paybill_details(entity)
-                transaction_data["processed_entity"] = business_name
-                transaction_data["account_no"] = account_no
-
-            case (x, y, z) if "customer payment to small business to" in x:
-                transaction_data["category"] = "Pochi"
-                transaction_data["subcategory"] = "pochi"
-                transaction_data["processed_entity"] = self.process_masked_phone(
-                    entity
-                )[0]
-
-            case (x, y, z) if "withdrawal" in x and not y[0:4] == "from":
-                transaction_data["category"] = "CashWithdrawals"
-                transaction_data["is_charge"] = "charge" in x
-                transaction_data["subcategory"] = (
-                    "charge" if transaction_data["is_charge"] == True else "withdrawal"
-                )
-
-            case (x, y, z) if "airtime" in x or "bundles" in y or "bundle" in x:
-                transaction_data["category"] = "airtime_bundle"
-                transaction_data["is_charge"] = False
-                transaction_data["subcategory"] = "purchase"
-                transaction_data["processed_entity"] = self.process_masked_phone(
-                    entity
-                )[0]
-
+            "SendMoney": _contains_any(
+                x, "customer transfer", "send money", "transfer to other small business to"
+            ),
+            "businessPayment_toCustomer": _equals(z, "small business payment to"),
+            "Overdraft": _contains_any(x, "overdraft", "od loan"),
+            "BuyGoodsPayments": _contains_any(x, "merchant payment", "pay merchant"),
+            "PayBillPayments": _contains_any(x, "pay bill"),
+            "Pochi": _contains_any(x, "customer payment to small business to"),
+            "CashWithdrawals": _contains_any(x, "withdrawal")
+            & ~y.str.startswith("from").to_numpy(dtype=bool),
+            "airtime_bundle": _contains_any(x, "airtime", "bundle")
+            | _contains_any(y, "bundles"),
             # Special Cases
-            case (x, y, z) if x == "nan":
-                # I found in Some statements, some transactions did not have any details
-                transaction_data["category"] = "NoDetails"
-                transaction_data["is_charge"] = ""
-                transaction_data["subcategory"] = ""
-
-            case _:
-                transaction_data["category"] = "uncategorized"
-                transaction_data["subcategory"] = "unknown"
-                transaction_data["processed_entity"] = (
-                    self.process_masked_phone(entity)
-                    if entity[0:2].isnumeric() == True
-                    else "non"
-                )
-
-        return transaction_data
+            # I found in Some statements, some transactions did not have any details
+            "NoDetails": _equals(x, "nan"),
+        }
 
     def categorize_transactions(
         self, df_clean: pd.DataFrame
-    ) -> Dict[str, pd.DataFrame]:
+    ) -> Mapping[str, pd.DataFrame]:
         """
-        Categorize all transactions in a single pass.
+        Categorize all transactions with vectorized column operations.
 
         Args:
             df_clean: Cleaned DataFrame with M-Pesa transactions
 
         Returns:
-            Dictionary mapping category names to DataFrames
+            CategoryView mapping category names to DataFrames
         """
-        print(f"🔄 Categorizing {df_clean['receipt_no'].nunique()} transactions...")
-
-        # Single pass through all transactions
-        for _, row in df_clean.iterrows():
-            transaction_data = self.categorize_transaction(row)
-            category = transaction_data["category"]
-
-            # Add to appropriate category
-            if category in self.categories:
-                self.categories[category].append(transaction_data)
-
-        # Convert to DataFrames for easy analysis
-        categorized_dfs = {}
-        for category, transactions in self.categories.items():
-            if transactions:
-                categorized_dfs[category] = pd.DataFrame(transactions)
-                print(f"✅ {category}: {len(transactions)} transactions")
-            else:
-                categorized_dfs[category] = pd.DataFrame()
+        if self.verbose:
+            print(f"🔄 Categorizing {df_clean['receipt_no'].nunique()} transactions...")
+
+        # Lowercase the matched text once for the whole statement. The free
+        # text columns are Arrow-backed (a no-op after clean_data) so the .str
+        # calls run on Arrow kernels; missing text keeps the "nan" spelling
+        details = df_clean["details"].astype("string[pyarrow]").str.lower().fillna("nan")
+        type_desc = _lowercase_categorical(df_clean["type_desc"])
+        type_class = _lowercase_categorical(df_clean["type_class"])
+        entity = df_clean["entity"].astype("string[pyarrow]").fillna("nan")
+
+        # Statements repeat the same text on many rows, so the rules run once
+        # per distinct (details, type_desc, type_class) and are broadcast back
+        key = pd.factorize(details)[0].astype(np.int64)
+        for column in (type_desc, type_class):
+            key = key * len(column.cat.categories) + column.cat.codes.to_numpy()
+        _, first, inverse = np.unique(key, return_index=True, return_inverse=True)
+
+        # First matching rule wins, as in the old per-row match/case. Rows
+        # get integer codes into self.categories rather than name strings
+        unique_text = {
+            "details": details.iloc[first],
+            "type_desc": type_desc.iloc[first],
+            "type_class": type_class.iloc[first],
+        }
+        masks = self._category_masks(**unique_text)
+        unique_codes = np.select(
+            list(masks.values()),
+            [self.categories.index(name) for name in masks],
+            default=self.categories.index("uncategorized"),
+        )
+        codes = unique_codes[inverse]
+
+        # Charge flags also depend only on the text: one "charge" scan per
+        # column over the distinct rows, picked by the column each category
+        # names the charge in
+        has_charge = {
+            column: text.str.contains("charge", regex=False).to_numpy(dtype=bool)
+            for column, text in unique_text.items()
+        }
+        is_charge = np.select(
+            [unique_codes == self.categories.index(name) for name in CHARGE_COLUMNS],
+            [has_charge[column] for column in CHARGE_COLUMNS.values()],
+            default=False,
+        )[inverse]
+        in_category = {name: codes == i for i, name in enumerate(self.categories)}
+
+        processed_entity = entity.to_numpy(dtype=object)
+        account_no = np.full(len(df_clean), None, dtype=object)
+        subcategory = np.full(len(df_clean), None, dtype=object)
+
+        # Counterparties that may be a person or a business
+        split_rows = np.flatnonzero(
+            np.logical_or.reduce([in_category[name] for name in ENTITY_SPLIT_CATEGORIES])
+        )
+        processed_entity[split_rows], account_no[split_rows] = _split_entities(
+            entity.iloc[split_rows]
+        )
 
-        print(
-            f"🎯 Categorization complete! Found {len([c for c in categorized_dfs.values() if len(c) > 0])} active categories"
+        # Counterparties that are always a masked phone number and a name
+        rows = np.flatnonzero(
+            np.logical_or.reduce([in_category[name] for name in MASKED_PHONE_CATEGORIES])
+        )
+        processed_entity[rows] = _split_masked_phones(entity.iloc[rows])[0]
+
+        rows = np.flatnonzero(in_category["PayBillPayments"])
+        processed_entity[rows], account_no[rows] = _split_paybills(entity.iloc[rows])
+
+        for name, label in (
+            ("Deposit", "deposit"),
+            ("MShwari", "mshwari"),
+            ("Overdraft", "overdraft"),
+            ("Pochi", "pochi"),
+            ("airtime_bundle", "purchase"),
+            ("NoDetails", ""),
+            ("uncategorized", "unknown"),
+        ):
+            subcategory[in_category[name]] = label
+        for name in ("HustlerFund", "KCB"):
+            mask = in_category[name]
+            subcategory[mask] = type_desc[mask].to_numpy(dtype=object)
+        for name, other in (
+            ("SendMoney", "transfer"),
+            ("BuyGoodsPayments", ""),
+            ("PayBillPayments", ""),
+            ("CashWithdrawals", "withdrawal"),
+        ):
+            mask = in_category[name]
+            subcategory[mask] = np.where(is_charge[mask], "charge", other)
+        for i in np.flatnonzero(in_category["Reversals"]):
+            subcategory[i] = ()
+
+        uncategorized_rows = np.flatnonzero(in_category["uncategorized"])
+        processed_entity[uncategorized_rows] = "non"
+        rows = uncategorized_rows[
+            _starts_with_digits(entity.iloc[uncategorized_rows], 2)
+        ]
+        # Kept as (name, phone) pairs
+        for i, pair in zip(rows, zip(*_split_masked_phones(entity.iloc[rows]))):
+            processed_entity[i] = pair
+
+        df_out = pd.DataFrame(
+            {
+                "receipt_no": df_clean["receipt_no"],
+                "date_time": df_clean["date_time"],
+                "details": df_clean["details"],
+                "paid_in": df_clean["paid_in"],
+                "withdrawn": df_clean["withdrawn"],
+                "entity": entity,
+                "type_class": df_clean["type_class"],
+                "type_desc": df_clean["type_desc"],
+                "month": df_clean["month"],
+                "week": df_clean["week"],
+                "processed_entity": processed_entity,
+                "is_charge": is_charge,
+                "category": pd.Categorical.from_codes(codes, self.categories),
+                # A handful of labels plus the loan type descriptions
+                "subcategory": pd.Categorical(subcategory),
+                "account_no": account_no,
+            }
+        )
+
+        # Integer codes make the analyzer's entity groupbys and unique
+        # receipt counts hash ints instead of strings
+        for col in ("processed_entity", "receipt_no"):
+            df_out[col] = df_out[col].astype("category")
+
+        # A stable sort on the codes groups the rows while keeping statement
+        # order within each category, so every category is a contiguous slice
+        # of one master frame
+        order = np.argsort(codes, kind="stable")
+        bounds = np.searchsorted(codes[order], np.arange(len(self.categories) + 1))
+        categorized_dfs = CategoryView(
+            df_out.iloc[order],
+            {
+                name: (int(bounds[i]), int(bounds[i + 1]))
+                for i, name in enumerate(self.categories)
+            },
         )
-        if len(categorized_dfs["uncategorized"]) > 0:
-            print("Uncategorized type classes")
-            print(categorized_dfs["uncategorized"]["type_class"].unique())
-        else:
-            print("All transactions categorized")
+
+        if self.verbose:
+            for category_name, category_df in categorized_dfs.items():
+                print(f"✅ {category_name}: {len(category_df)} transactions")
+            print(
+                f"🎯 Categorization complete! Found {len([c for c in categorized_dfs.values() if len(c) > 0])} active categories"
+            )
+            if len(categorized_dfs["uncategorized"]) > 0:
+                print("Uncategorized type classes")
+                print(categorized_dfs["uncategorized"]["type_class"].unique())
+            else:
+                print("All transactions categorized")
 
         return categorized_dfs
 
@@ -372,38 +501,50 @@ class TransactionCategorizer:
         Returns:
             Summary DataFrame with category statistics
         """
-        summary_data = []
-
-        for category, df in categorized_data.items():
-            if len(df) > 0:
-                summary_data.append(
-                    {
-                        "category": category,
-                        "transaction_count": df["receipt_no"].nunique(),
-                        "total_withdrawn": df["withdrawn"].sum(),
-                        "total_paid_in": df["paid_in"].sum(),
-                        "unique_entities": df["processed_entity"].nunique(),
-                        "date_range": f"{df['date_time'].min().strftime('%Y-%m-%d')} to {df['date_time'].max().strftime('%Y-%m-%d')}",
-                    }
-                )
-
-        return pd.DataFrame(summary_data)
+        frames = {
+            category: df[SUMMARY_COLUMNS]
+            for category, df in categorized_data.items()
+            if len(df) > 0
+        }
+        if not frames:
+            return pd.DataFrame()
+
+        # One grouped pass over all categories instead of six scans per category
+        summary = (
+            pd.concat(frames, names=["category"])
+            .groupby(level="category", sort=False)
+            .agg(
+                transaction_count=("receipt_no", "nunique"),
+                total_withdrawn=("withdrawn", "sum"),
+                total_paid_in=("paid_in", "sum"),
+                unique_entities=("processed_entity", "nunique"),
+                first_date=("date_time", "min"),
+                last_date=("date_time", "max"),
+            )
+        )
+        summary["date_range"] = (
+            summary.pop("first_date").dt.strftime("%Y-%m-%d")
+            + " to "
+            + summary.pop("last_date").dt.strftime("%Y-%m-%d")
+        )
+        return summary.reset_index()
 
 
 # Convenience functions for easy usage
 def categorize_transactions_efficiently(
-    df_clean: pd.DataFrame,
-) -> Dict[str, pd.DataFrame]:
+    df_clean: pd.DataFrame, verbose: bool = False
+) -> Mapping[str, pd.DataFrame]:
     """
     Convenience function to categorize transactions efficiently.
 
     Args:
         df_clean: Cleaned DataFrame with M-Pesa transactions
+        verbose: Print progress and per-category counts
 
     Returns:
-        Dictionary mapping category names to DataFrames
+        CategoryView mapping category names to DataFrames
     """
-    categorizer = TransactionCategorizer()
+    categorizer = TransactionCategorizer(verbose=verbose)
     return categorizer.categorize_transactions(df_clean)
 
 
@@ -9,6 +9,50 @@ import streamlit as st
 import pandas as pd
 from typing import Dict, Any, Optional, List, Union
 
+# Column configs are plain dicts that st.dataframe deep-copies before use,
+# so they are built once here instead of on every rerun
+
+# Aggregated per-entity tables; the processed_entity label is per tab
+AGGREGATE_COLUMN_CONFIG = {
+    "amount": st.column_config.NumberColumn("Amount"),
+    "count": st.column_config.NumberColumn("Transactions", width="small"),
+}
+
+# Transactions for the entities selected in an aggregated table
+DETAIL_COLUMN_CONFIG = {
+    "receipt_no": st.column_config.Column("Receipt No.", width="small"),
+    "date_time": st.column_config.DatetimeColumn(
+        "Date/Time", format="ddd, DD MMM, YY | hh:mma"
+    ),
+    "details": st.column_config.Column("Transaction Details"),
+    "withdrawn": st.column_config.NumberColumn("Withdrawn", format="%.0f/="),
+    "paid_in": st.column_config.NumberColumn("Paid-in", format="%.0f/="),
+    "transaction_type": st.column_config.Column("Type", width="small"),
+}
+
+# Every transaction in a tab
+FULL_TRANSACTION_COLUMN_CONFIG = {
+    "receipt_no": st.column_config.Column("Receipt No.", width="small"),
+    "date_time": st.column_config.DatetimeColumn(
+        "Date/Time", format="ddd, DD MMM, YY | hh:mma"
+    ),
+    "paid_in": st.column_config.NumberColumn("Paid-in", format="%.0f/=", width="small"),
+    "withdrawn": st.column_config.NumberColumn(
+        "Withdrawn", format="%.0f/=", width="small"
+    ),
+    "details": st.column_config.Column("Transaction Details"),
+}
+
+
+def format_amount(x: float) -> str:
+    """Format an amount as whole shillings, e.g. "1,250/=" """
+    return f"{x:,.0f}/="
+
+
+def format_optional_amount(x: Optional[float]) -> str:
+    """Format an amount, leaving missing and zero amounts blank"""
+    return format_amount(x) if x is not None and x != 0 else ""
+
 
 def create_metrics_display(
     spend: float, charges: Optional[float], transactions: int, frame: pd.DataFrame
@@ -77,14 +121,11 @@ def create_styled_dataframe(
         gradient_subset = ["count"]
 
     if format_dict is None:
-        format_dict = {"amount": lambda x: f"{x:,.0f}/="}
+        format_dict = {"amount": format_amount}
 
     if column_config is None:
         column_config = {
-            "amount": st.column_config.NumberColumn("Amount"),
-            "count": st.column_config.NumberColumn(
-                "Transactions", width="small"
-            ),
+            **AGGREGATE_COLUMN_CONFIG,
             "processed_entity": st.column_config.Column(
                 f"{merchant_type}", pinned=True
             ),
@@ -126,11 +167,11 @@ def transaction_lookup(
     # Get all selected row indices
     selected_indices = selection["rows"]
 
-    # Extract processed_entity values for all selected rows
-    entity_values = [frame.iloc[idx]["processed_entity"] for idx in selected_indices]
+    # Extract processed_entity values for all selected rows in one gather
+    entity_values = frame["processed_entity"].to_numpy()[selected_indices]
 
-    # Filter for all selected entities
-    result = df[df["processed_entity"].isin(entity_values)].copy()
+    # Filter for all selected entities; the mask already yields a new frame
+    result = df[df["processed_entity"].isin(entity_values)]
 
     # Sort by date_time for better readability (most recent first)
     if "date_time" in result.columns:
@@ -154,27 +195,12 @@ def create_transaction_detail_section(
     """
     if not result.empty:
         with st.expander(f"Details for selected {merchant_type}"):
-            # Create default column configuration if none provided
+            # Use the default column configuration if none provided
             if column_config is None:
-                column_config = {
-                    "receipt_no": st.column_config.Column("Receipt No.", width="small"),
-                    "date_time": st.column_config.DatetimeColumn(
-                        "Date/Time", format="ddd, DD MMM, YY | hh:mma"
-                    ),
-                    "details": st.column_config.Column("Transaction Details"),
-                    "withdrawn": st.column_config.NumberColumn(
-                        "Withdrawn", format="%.0f/="
-                    ),
-                    "paid_in": st.column_config.NumberColumn(
-                        "Paid-in", format="%.0f/="
-                    ),
-                    "transaction_type": st.column_config.Column("Type", width="small"),
-                }
+                column_config = DETAIL_COLUMN_CONFIG
 
             # Apply styling for currency formatting
-            styled_df = result.style.format(
-                {"amount": lambda x: f"{x:,.0f}/=" if x is not None and x != 0 else ""}
-            )
+            styled_df = result.style.format({"amount": format_optional_amount})
 
             st.dataframe(styled_df, hide_index=True, column_config=column_config)
     else:
@@ -226,7 +252,7 @@ def create_transaction_tab(
     Args:
         frame: Aggregated transaction DataFrame
         raw_df: Raw transaction DataFrame
-        fig: Plotly figure for visualization
+        fig: Plotly figure, or a zero-argument callable that builds it
         spend: Total amount spent
         charges: Total charges
         transactions: Number of transactions
@@ -248,21 +274,15 @@ def create_transaction_tab(
                 st.markdown("\n")
                 st.markdown("\n")
 
-                # Create column config
+                # Create column config, adding additional columns if provided
                 column_config = {
-                    "amount": st.column_config.NumberColumn("Amount"),
-                    "count": st.column_config.NumberColumn(
-                        "Transactions", width="small"
-                    ),
+                    **AGGREGATE_COLUMN_CONFIG,
                     "processed_entity": st.column_config.Column(
                         merchant_type, pinned=True
                     ),
+                    **(additional_columns or {}),
                 }
 
-                # Add additional columns if provided
-                if additional_columns:
-                    column_config.update(additional_columns)
-
                 # Create styled dataframe
                 event = create_styled_dataframe(
                     data=frame,
@@ -289,7 +309,7 @@ def create_transaction_tab(
 
             with st.container():
                 st.plotly_chart(
-                    fig, 
+                    fig() if callable(fig) else fig,
                     use_container_width=True, key=f"{transaction_type}_fig",
                     title=f"Top 10  {transaction_type}",
                     config={ 'fillFrame' : True}
@@ -300,19 +320,7 @@ def create_transaction_tab(
                 raw_df,
                 transaction_type,
                 display_columns,
-                column_config={
-                    "receipt_no": st.column_config.Column("Receipt No.", width="small"),
-                    "date_time": st.column_config.DatetimeColumn(
-                        "Date/Time", format="ddd, DD MMM, YY | hh:mma"
-                    ),
-                    "paid_in": st.column_config.NumberColumn(
-                        "Paid-in", format="%.0f/=", width="small"
-                    ),
-                    "withdrawn": st.column_config.NumberColumn(
-                        "Withdrawn", format="%.0f/=", width="small"
-                    ),
-                    "details": st.column_config.Column("Transaction Details"),
-                },
+                column_config=FULL_TRANSACTION_COLUMN_CONFIG,
             )
     else:
         st.warning(
@@ -5,18 +5,111 @@ This module provides standardized visualization functions for transaction data a
 reducing code duplication and ensuring consistent chart styling across the application.
 """
 
-import plotly.express as px
-import plotly.graph_objects as go
+import functools
+
+import numpy as np
+import plotly.io as pio
 import pandas as pd
-from typing import Optional, Dict, Any
+from plotly.colors import qualitative
+from typing import TYPE_CHECKING, Optional, Dict, Any, List, Union
+
+# plotly.graph_objects is only imported once a figure is built, so importing
+# this module (and hot reloads of the app) skip it; Plotly Express not at all
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
 
 # Default configuration
 DEFAULT_COLOR_SCALE = ""
+DEFAULT_PIE_COLORS = tuple(qualitative.Set3)
 DEFAULT_TEMPLATE = "xgridoff"
 # ['ggplot2', 'seaborn', 'simple_white', 'plotly','plotly_white', 'plotly_dark', 'presentation', 'xgridoff','ygridoff', 'gridon', 'none']
 DEFAULT_HEIGHT = 500
 MIN_BAR_HEIGHT = 40
 LARGEST = 10
+MAX_PIE_SLICES = 20
+
+
+def _top_n_ascending(data: pd.DataFrame, col: str, n: int = LARGEST) -> pd.DataFrame:
+    """
+    Rows with the n largest values of a column, in ascending order.
+
+    Same rows as data.nlargest(n, col).sort_values(col), found with an O(N)
+    partition instead of sorting the whole column. Ties keep row order. As
+    with nlargest, rows with a missing value are only kept (last) when the
+    frame has no more than n rows.
+
+    Args:
+        data: DataFrame to select from
+        col: Numeric column to rank by
+        n: Number of rows to keep
+
+    Returns:
+        DataFrame with at most n rows
+    """
+    values = data[col].to_numpy(dtype=float)
+    # Already-aggregated frames are often this small: just sort them
+    if values.size <= n:
+        return data.iloc[np.argsort(values, kind="stable")]
+
+    positions = np.flatnonzero(~np.isnan(values))
+    if positions.size > n:
+        candidates = values[positions]
+        kth = np.partition(candidates, positions.size - n)[positions.size - n]
+        # Everything above the n-th largest value, then the earliest ties,
+        # as nlargest keeps them
+        above = positions[candidates > kth]
+        ties = positions[candidates == kth][: n - above.size]
+        positions = np.concatenate([above, ties])
+    positions = positions[np.argsort(values[positions], kind="stable")]
+    return data.iloc[positions]
+
+
+def _downcast(values: np.ndarray) -> np.ndarray:
+    """
+    Narrowest dtype that holds the values exactly, to shrink the figure JSON.
+
+    Integers are downcast as far as they fit. Floats only become float32
+    when no value changes, so amounts shown on hover keep their cents.
+    """
+    if values.dtype.kind in "iu":
+        return pd.to_numeric(values, downcast="integer")
+    if values.dtype.kind == "f":
+        narrow = values.astype(np.float32)
+        if np.array_equal(narrow, values, equal_nan=True):
+            return narrow
+    return values
+
+
+def _column_key(data: pd.DataFrame, col: str) -> tuple:
+    """
+    Hashable copy of a column for the figure caches.
+
+    Goes through the column's array once with tolist, rather than iterating
+    the Series and boxing every element as a NumPy scalar.
+    """
+    return tuple(data[col].to_numpy(copy=False).tolist())
+
+
+@functools.lru_cache(maxsize=None)
+def _template_spec(template: str) -> Dict[str, Any]:
+    """
+    Plain-dict form of a named Plotly template, resolved once per template.
+
+    Every chart spec embeds the same dict, so callers must not modify it.
+    """
+    return pio.templates[template].to_plotly_json()
+
+
+def _format_pie_values(values: tuple) -> np.ndarray:
+    """Pie values as Plotly prints them on hover: 10 significant digits, trimmed."""
+    return np.array(
+        [
+            np.format_float_positional(
+                value, precision=10, unique=False, fractional=False, trim="-"
+            )
+            for value in np.asarray(values, dtype=float)
+        ]
+    )
 
 
 def create_horizontal_bar_chart(
@@ -29,7 +122,10 @@ def create_horizontal_bar_chart(
     text_template: str = "%{x:,.0f}/=",
     height: Optional[int] = None,
     hover_data: str = "count",
-) -> go.Figure:
+    n_largest: int = LARGEST,
+    return_json: bool = False,
+    return_dict: bool = False,
+) -> Union["go.Figure", str, Dict[str, Any]]:
     """
     Create a standardized horizontal bar chart for transaction analysis.
 
@@ -43,46 +139,173 @@ def create_horizontal_bar_chart(
         text_template: Template for text labels on bars
         height: Chart height (auto-calculated if None)
         n_largest: Number of top entities to display
+        return_json: Return the figure serialized as a JSON string
+        return_dict: Return the figure as a plain, unvalidated Plotly dict
 
     Returns:
-        Plotly figure object
+        Plotly figure object, or its JSON or dict form when requested
     """
-    if data.empty:
+    if data is None or len(data.index) == 0:
         return None  # type: ignore
 
     # Calculate dynamic height based on sorted data if not specified
     if height is None:
         height = max(DEFAULT_HEIGHT, MIN_BAR_HEIGHT)
 
-    fig = px.bar(
-        data.nlargest(LARGEST, x_col).sort_values(by=x_col, ascending=True),
-        y=y_col,
-        x=x_col,
-        orientation="h",
-        title=title,
-        # color=x_col,
-        color_continuous_scale=color_scale,
-        template=template,
-        hover_data="count",
+    key = _bar_chart_key(
+        data, x_col, y_col, title, color_scale, template, text_template, height, n_largest
     )
+    if return_json:
+        return _bar_chart_json(*key)
+    if return_dict:
+        return _bar_chart_dict(*key)
+    return _build_bar_chart(*key)
+
+
+def _bar_chart_key(
+    data: pd.DataFrame,
+    x_col: str,
+    y_col: str,
+    title: str,
+    color_scale: str,
+    template: str,
+    text_template: str,
+    height: int,
+    n_largest: int,
+) -> tuple:
+    """Cache key of a bar chart: its top rows' plotted values and its styling."""
+    top = _top_n_ascending(data, x_col, n_largest)
+    return (
+        _column_key(top, y_col),
+        _column_key(top, x_col),
+        _column_key(top, "count"),
+        x_col,
+        y_col,
+        title,
+        color_scale,
+        template,
+        text_template,
+        height,
+    )
+
+
+def create_horizontal_bar_charts_batch(
+    specs: List[Dict[str, Any]],
+    template: str = DEFAULT_TEMPLATE,
+    text_template: str = "%{x:,.0f}/=",
+    n_largest: int = LARGEST,
+) -> "go.Figure":
+    """
+    Create several horizontal bar charts as stacked subplots of one figure.
+
+    Each subplot gets the same top entities, text and hover labels as
+    create_horizontal_bar_chart, but the layout is built and rendered once.
+
+    Args:
+        specs: One dict per chart with "data", "x_col", "y_col" and "title"
+        template: Plotly template
+        text_template: Template for text labels on bars
+        n_largest: Number of top entities to display per chart
+
+    Returns:
+        Plotly figure object, or None if every chart's data is empty
+    """
+    from plotly.subplots import make_subplots
+
+    specs = [
+        spec
+        for spec in specs
+        if spec["data"] is not None and len(spec["data"].index)
+    ]
+    if not specs:
+        return None  # type: ignore
+
+    fig = make_subplots(
+        rows=len(specs), cols=1, subplot_titles=[spec["title"] for spec in specs]
+    )
+    for row, spec in enumerate(specs, start=1):
+        key = _bar_chart_key(
+            spec["data"],
+            spec["x_col"],
+            spec["y_col"],
+            spec["title"],
+            DEFAULT_COLOR_SCALE,
+            template,
+            text_template,
+            DEFAULT_HEIGHT,
+            n_largest,
+        )
+        fig.add_trace(_bar_chart_dict(*key)["data"][0], row=row, col=1)
 
     fig.update_layout(
-        height=height if height else DEFAULT_HEIGHT,
+        template=template,
+        height=DEFAULT_HEIGHT * len(specs),
         showlegend=False,
-        xaxis_title="",
-        xaxis=dict(showticklabels=False),
-        yaxis_title="",
         dragmode=False,
-        title=f"Top 10 by transaction amount"
     )
+    fig.update_xaxes(showticklabels=False)
+    return fig
 
-    fig.update_traces(
-        texttemplate=text_template,
-        textposition="auto",
-        hovertemplate=" %{customdata} transaction(s)",
-    )
 
-    return fig
+# Figures are memoized on their plotted values, so dashboard reruns with the
+# same data skip figure construction entirely. Callers must not modify the result
+@functools.lru_cache(maxsize=128)
+def _bar_chart_dict(
+    y_values: tuple,
+    x_values: tuple,
+    counts: tuple,
+    x_col: str,
+    y_col: str,
+    title: str,
+    color_scale: str,
+    template: str,
+    text_template: str,
+    height: int,
+) -> Dict[str, Any]:
+    """Plain Plotly figure spec of the horizontal bar chart."""
+    # Written out as Plotly's JSON schema: the chart is fixed, so neither
+    # Plotly Express preprocessing nor graph_objects validation is needed
+    return {
+        "data": [
+            {
+                "type": "bar",
+                "x": _downcast(np.asarray(x_values)),
+                "y": np.asarray(y_values, dtype=object),
+                "orientation": "h",
+                "name": "",
+                "texttemplate": text_template,
+                "textposition": "auto",
+                # Hover labels are plain text built here, so the browser does
+                # no template formatting on hover
+                "hovertext": np.char.add(
+                    np.char.add(" ", np.asarray(counts).astype(str)), " transaction(s)"
+                ),
+                "hoverinfo": "text",
+                "showlegend": False,
+            }
+        ],
+        "layout": {
+            "template": _template_spec(template),
+            "height": height if height else DEFAULT_HEIGHT,
+            "margin": {} if title else {"t": 60},
+            "showlegend": False,
+            "xaxis": {"title": {"text": ""}, "showticklabels": False},
+            "yaxis": {"title": {"text": ""}},
+            "dragmode": False,
+            "title": {"text": "Top 10 by transaction amount"},
+        },
+    }
+
+
+@functools.lru_cache(maxsize=128)
+def _build_bar_chart(*key) -> "go.Figure":
+    """Figure of _bar_chart_dict(*key)."""
+    import plotly.graph_objects as go
+
+    # go.Figure validates a template name faster than the resolved dict, so
+    # pass the name (key[7], see _bar_chart_key) in place of the plain spec's
+    spec = _bar_chart_dict(*key)
+    return go.Figure({**spec, "layout": {**spec["layout"], "template": key[7]}})
 
 
 def create_pie_chart(
@@ -91,8 +314,10 @@ def create_pie_chart(
     names_col: str,
     title: str,
     template: str = DEFAULT_TEMPLATE,
-    color_sequence: list = None,  # type: ignore
-) -> go.Figure:
+    color_sequence: Optional[tuple] = None,
+    return_json: bool = False,
+    return_dict: bool = False,
+) -> Union["go.Figure", str, Dict[str, Any]]:
     """
     Create a standardized pie chart for transaction analysis.
 
@@ -102,26 +327,112 @@ def create_pie_chart(
         names_col: Column name for pie slice names
         title: Chart title
         template: Plotly template
-        color_sequence: Color sequence for pie slices
+        color_sequence: Color sequence for pie slices (DEFAULT_PIE_COLORS if None)
+        return_json: Return the figure serialized as a JSON string
+        return_dict: Return the figure as a plain, unvalidated Plotly dict
 
     Returns:
-        Plotly figure object
+        Plotly figure object, or its JSON or dict form when requested
     """
-    if data.empty:
+    if data is None or len(data.index) == 0:
         return None  # type: ignore
 
     if color_sequence is None:
-        color_sequence = px.colors.qualitative.Set3
-
-    fig = px.pie(
-        data,
-        values=values_col,
-        names=names_col,
-        title=title,
-        color_discrete_sequence=color_sequence,
-        template=template,
+        color_sequence = DEFAULT_PIE_COLORS
+
+    # One slice per name, as Plotly.js would otherwise sum repeated labels on
+    # every render; a crowded pie keeps its MAX_PIE_SLICES - 1 largest slices
+    # and folds the rest into "Other"
+    slices = data.groupby(names_col, observed=True, sort=False)[values_col].sum()
+    if len(slices) > MAX_PIE_SLICES:
+        order = np.argsort(-slices.to_numpy(), kind="stable")
+        rest = np.zeros(len(slices), dtype=bool)
+        rest[order[MAX_PIE_SLICES - 1 :]] = True
+        slices = (
+            pd.concat([slices[~rest], pd.Series({"Other": slices[rest].sum()})])
+            .groupby(level=0, sort=False)
+            .sum()
+        )
+
+    key = (
+        tuple(slices.to_numpy().tolist()),
+        tuple(slices.index.to_numpy().tolist()),
+        values_col,
+        names_col,
+        title,
+        template,
+        tuple(color_sequence),
     )
+    if return_json:
+        return _pie_chart_json(*key)
+    if return_dict:
+        return _pie_chart_dict(*key)
+    return _build_pie_chart(*key)
 
-    fig.update_traces(textposition="inside", textinfo="percent+label")
 
-    return fig
+@functools.lru_cache(maxsize=128)
+def _pie_chart_dict(
+    values: tuple,
+    names: tuple,
+    values_col: str,
+    names_col: str,
+    title: str,
+    template: str,
+    color_sequence: tuple,
+) -> Dict[str, Any]:
+    """Plain Plotly figure spec of the pie chart, memoized like _bar_chart_dict."""
+    layout = {
+        "template": _template_spec(template),
+        "piecolorway": list(color_sequence),
+    }
+    # Untitled charts get the same reduced top margin Plotly Express gave them
+    if title:
+        layout["title"] = {"text": title}
+    else:
+        layout["margin"] = {"t": 60}
+
+    labels = np.asarray(names, dtype=object)
+
+    return {
+        "data": [
+            {
+                "type": "pie",
+                "values": _downcast(np.asarray(values)),
+                "labels": labels,
+                "name": "",
+                "textposition": "inside",
+                "textinfo": "percent+label",
+                "hovertext": np.char.add(
+                    np.char.add(f"{names_col}=", labels.astype(str)),
+                    np.char.add(f"<br>{values_col}=", _format_pie_values(values)),
+                ),
+                "hoverinfo": "text",
+            }
+        ],
+        "layout": layout,
+    }
+
+
+@functools.lru_cache(maxsize=128)
+def _build_pie_chart(*key) -> "go.Figure":
+    """Figure of _pie_chart_dict(*key)."""
+    import plotly.graph_objects as go
+
+    # Template by name, as in _build_bar_chart (key[5], see create_pie_chart)
+    spec = _pie_chart_dict(*key)
+    return go.Figure({**spec, "layout": {**spec["layout"], "template": key[5]}})
+
+
+# Serialized figures are cached separately, so a consumer that ships JSON to
+# the client skips both figure construction and serialization on a hit.
+# The figure was validated when it was built, so serialization skips it
+@functools.lru_cache(maxsize=128)
+def _bar_chart_json(*key) -> str:
+    """JSON of _build_bar_chart(*key)."""
+    return pio.to_json(_build_bar_chart(*key), validate=False, pretty=False)
+
+
+@functools.lru_cache(maxsize=128)
+def _pie_chart_json(*key) -> str:
+    """JSON of _build_pie_chart(*key)."""
+    return pio.to_json(_build_pie_chart(*key), validate=False, pretty=False)